@@ -1,7 +1,14 @@
-import re
-from typing import List, Set, Tuple
+from functools import lru_cache
+from itertools import chain
+from typing import List, Optional, Set, Tuple
 
 
+# access modifiers understood by the header generators
+PUBLIC = "public"
+PRIVATE = "private"
+
+
+@lru_cache(maxsize=4096)
 def camel_to_snake_case(camel_str):
     """
     Convert a camelCase or PascalCase string to snake_case.
@@ -15,29 +22,36 @@ def camel_to_snake_case(camel_str):
     Returns:
         str: The snake_case version of the string.
     """
-    # Add underscores before uppercase letters that are not at the start
-    snake_str = re.sub(
-        r"(?<!^)(?=[A-Z])", "_", camel_str
-    )  # Adds underscores before capital letters
+    # Already snake_case (lowercase letters and single inner underscores only),
+    # so there is nothing to convert
+    if (
+        camel_str.islower()
+        and camel_str.replace("_", "").isalpha()
+        and "__" not in camel_str
+        and not camel_str.endswith("_")
+    ):
+        return camel_str
 
-    # Add underscores between letters and digits, but not between digits themselves
-    snake_str = re.sub(
-        r"(?<=\D)(?=\d)", "_", snake_str
-    )  # Adds underscores between letters and digits
-    snake_str = re.sub(
-        r"(?<=\d)(?=\D)", "_", snake_str
-    )  # Adds underscores between digits and letters
+    chars: List[str] = []
+    prev_is_digit = False
 
-    # Convert all to lowercase
-    snake_str = snake_str.lower()
+    for ch in camel_str:
+        is_digit = ch.isdecimal()
 
-    # Remove multiple consecutive underscores
-    snake_str = re.sub(r"_{2,}", "_", snake_str)
+        # Add underscores before capital letters that are not at the start,
+        # and between letters and digits, but not between digits themselves.
+        # Never emit two underscores in a row.
+        if chars and chars[-1] != "_":
+            if "A" <= ch <= "Z" or is_digit != prev_is_digit:
+                chars.append("_")
 
-    # Remove trailing underscores if they exist
-    snake_str = snake_str.rstrip("_")
+        if ch != "_" or not chars or chars[-1] != "_":
+            chars.append(ch)
 
-    return snake_str
+        prev_is_digit = is_digit
+
+    # Convert all to lowercase and remove trailing underscores if they exist
+    return "".join(chars).lower().rstrip("_")
 
 
 class CppType:
@@ -51,8 +65,17 @@ class CppType:
 
     @classmethod
     def all_types(cls):
-        """Return a list of all C++ types."""
-        return [cls.INT, cls.FLOAT, cls.DOUBLE, cls.CHAR, cls.STRING]
+        """Return a tuple of all C++ types."""
+        return _ALL_CPP_TYPES
+
+
+_ALL_CPP_TYPES = (
+    CppType.INT,
+    CppType.FLOAT,
+    CppType.DOUBLE,
+    CppType.CHAR,
+    CppType.STRING,
+)
 
 
 class CppMember:
@@ -65,7 +88,9 @@ class CppMember:
 
     def __str__(self):
         """Return the string representation of the member."""
-        return f"{self.type_name} {self.name}{'' if self.value == '' else '= ' + self.value};"
+        if self.value:
+            return f"{self.type_name} {self.name} = {self.value};"
+        return f"{self.type_name} {self.name};"
 
 
 class CppParameter:
@@ -88,7 +113,7 @@ class CppParameter:
     def get_str_repr(self, for_definition: bool):
         """Return the string representation of the member."""
         # we only put the default value in the declaration if there is a default value
-        return f"{'' if self.qualifier == '' else self.qualifier + ' '}{self.type_name} {'&' if self.reference else ''}{self.name}{'' if (self.default_value == '' or for_definition) else '= ' + self.default_value}"
+        return f"{self.qualifier + ' ' if self.qualifier else ''}{self.type_name} {'&' if self.reference else ''}{self.name}{'= ' + self.default_value if self.default_value and not for_definition else ''}"
 
 
 class CppMethod:
@@ -100,10 +125,10 @@ class CppMethod:
         return_type: str,
         parameters: List[CppParameter],
         body: str,
-        access_modifier: str = "public",
+        access_modifier: str = PUBLIC,
         initializer_list: str = "",
         define_in_header: bool = False,
-        qualifiers: List[str] = [],
+        qualifiers: Optional[List[str]] = None,
         docstring_comment: str = "",
     ):
         self.name = name
@@ -113,60 +138,65 @@ class CppMethod:
         self.access_modifier = access_modifier
         self.initializer_list = initializer_list
         self.define_in_header = define_in_header
-        self.qualifiers = qualifiers
+        self.qualifiers = qualifiers if qualifiers is not None else []
         self.docstring_comment = docstring_comment
 
     def declaration(self) -> str:
         """Return the declaration of the method"""
-        space = " " if self.return_type != "" else ""
-        qualifier_str = (
-            " " + " ".join(self.qualifiers) if len(self.qualifiers) != 0 else ""
+        docstring_prefix = (
+            self.docstring_comment + "\n" if self.docstring_comment else ""
         )
-        return f"{"" if self.docstring_comment == "" else self.docstring_comment + "\n"}{self.return_type}{space}{self.name}({', '.join([p.get_str_repr(False) for p in self.parameters])}){qualifier_str};"
+        space = " " if self.return_type else ""
+        qualifier_str = " " + " ".join(self.qualifiers) if self.qualifiers else ""
+        parameters_str = ", ".join([p.get_str_repr(False) for p in self.parameters])
+        return f"{docstring_prefix}{self.return_type}{space}{self.name}({parameters_str}){qualifier_str};"
 
     def get_definition(self, class_name: str) -> str:
         """Return the definition of the method with class name prepended."""
-        space = " " if self.return_type != "" else ""
+        space = " " if self.return_type else ""
         initializer = f" : {self.initializer_list}" if self.initializer_list else ""
-        qualifier_str = (
-            " " + " ".join(self.qualifiers) if len(self.qualifiers) != 0 else ""
-        )
+        qualifier_str = " " + " ".join(self.qualifiers) if self.qualifiers else ""
+        parameters_str = ", ".join([p.get_str_repr(True) for p in self.parameters])
 
-        definition = ""
         if self.define_in_header:
-            definition = f"{self.return_type}{space}{self.name}({', '.join([p.get_str_repr(True) for p in self.parameters])}){initializer}{qualifier_str} {{\n    {self.body}\n}}"
+            qualified_name = self.name
         else:
             # TODO: verify if this is the correct syntax wrt initializer list and qualifier string, could be a problem.
-            definition = f"{self.return_type}{space}{class_name}::{self.name}({', '.join([p.get_str_repr(True) for p in self.parameters])}){initializer}{qualifier_str} {{\n    {self.body}\n}}"
+            qualified_name = f"{class_name}::{self.name}"
 
-        return definition
+        return f"{self.return_type}{space}{qualified_name}({parameters_str}){initializer}{qualifier_str} {{\n    {self.body}\n}}"
 
 
 def get_public_and_private_methods_for_header(
     class_name: str, methods: List[CppMethod]
-) -> Tuple[List[str], List[str]]:
+) -> Tuple[str, str]:
     """
-    this function gets public and private method strings for a class.
+    this function gets the joined public and private method strings for a class.
     note that this was pulled out as both structs and classes use this
     """
 
     public_methods: List[str] = []
     private_methods: List[str] = []
 
+    public_append = public_methods.append
+    private_append = private_methods.append
+
     for method in methods:
-        if method.access_modifier == "public":
-            if method.define_in_header:
-                public_methods.append(method.get_definition(class_name))
-            else:
-                public_methods.append(method.declaration())
+        access_modifier = method.access_modifier
+        if access_modifier == PUBLIC:
+            append = public_append
+        elif access_modifier == PRIVATE:
+            append = private_append
+        else:
+            continue
 
-        if method.access_modifier == "private":
-            if method.define_in_header:
-                private_methods.append(method.get_definition(class_name))
-            else:
-                private_methods.append(method.declaration())
+        append(
+            method.get_definition(class_name)
+            if method.define_in_header
+            else method.declaration()
+        )
 
-    return public_methods, private_methods
+    return "\n    ".join(public_methods), "\n    ".join(private_methods)
 
 
 def generate_header_content_for_class_or_struct(
@@ -178,15 +208,14 @@ def generate_header_content_for_class_or_struct(
 
     members_str = "\n    ".join(str(member) for member in members)
 
-    public_methods, private_methods = get_public_and_private_methods_for_header(
-        class_or_struct_name, methods
+    public_methods_str, private_methods_str = (
+        get_public_and_private_methods_for_header(class_or_struct_name, methods)
     )
 
-    public_methods_str = "\n    ".join(public_methods)
-    private_methods_str = "\n    ".join(private_methods)
+    keyword = "class" if is_class else "struct"
 
     header_content = (
-        f"{'class' if is_class else 'struct'} {class_or_struct_name} {{\n"
+        f"{keyword} {class_or_struct_name} {{\n"
         f"public:\n"
         f"    {members_str}\n"
         f"\n    {public_methods_str}\n"
@@ -200,17 +229,14 @@ def generate_header_content_for_class_or_struct(
 def generate_source_content_for_class_or_struct(
     class_or_struct_name: str, methods: List[CppMethod]
 ) -> str:
-    source_content = ""
-
     # Add method definitions to the source content with class name prepended, so long as they're not already defined in header.
-    definitions_str = "\n\n".join(
-        method.get_definition(class_or_struct_name)
-        for method in methods
-        if not method.define_in_header
+    return "\n\n".join(
+        [
+            method.get_definition(class_or_struct_name)
+            for method in methods
+            if not method.define_in_header
+        ]
     )
-    source_content += definitions_str
-
-    return source_content
 
 
 class CppClass:
@@ -262,16 +288,16 @@ class CppClass:
         members_str = "\n    ".join(str(member) for member in self.members)
 
         # Separate public and private method declarations for string representation
-        public_methods_str = "\n    ".join(
-            method.declaration()
-            for method in self.methods
-            if method.access_modifier == "public"
-        )
-        private_methods_str = "\n    ".join(
-            method.declaration()
-            for method in self.methods
-            if method.access_modifier == "private"
-        )
+        public_methods: List[str] = []
+        private_methods: List[str] = []
+        for method in self.methods:
+            if method.access_modifier == PUBLIC:
+                public_methods.append(method.declaration())
+            elif method.access_modifier == PRIVATE:
+                private_methods.append(method.declaration())
+
+        public_methods_str = "\n    ".join(public_methods)
+        private_methods_str = "\n    ".join(private_methods)
 
         return (
             f"class {self.name} {{\n"
@@ -324,60 +350,67 @@ class CppHeaderAndSource:
         self.classes.append(cls)
 
     def generate_header_content(self) -> str:
-        header_file_content = ""
         guard_name = f"{camel_to_snake_case(self.name).upper()}_HPP"
-        all_includes = []
-        all_includes.extend(self.includes)
 
-        header_file_content += f"#ifndef {guard_name}\n"
-        header_file_content += f"#define {guard_name}\n\n"
-
-        for cls in self.classes:
-            all_includes.extend(cls.includes)
+        # dedupe includes while keeping their order, as include order can matter
+        seen_includes: Set[str] = set()
+        unique_includes: List[str] = []
+        for include in chain(self.includes, *(cls.includes for cls in self.classes)):
+            if include not in seen_includes:
+                seen_includes.add(include)
+                unique_includes.append(include)
 
-        header_file_content += "\n".join(all_includes)
+        header_parts: List[str] = [
+            f"#ifndef {guard_name}\n",
+            f"#define {guard_name}\n\n",
+            "\n".join(unique_includes),
+        ]
 
         for struct in self.structs:
-            header_file_content += struct.generate_header_content()
+            header_parts.append(struct.generate_header_content())
 
-        for header_code in self.extra_header_code:
-            header_file_content += header_code
+        header_parts.extend(self.extra_header_code)
 
-        header_file_content += "\n\n"
+        header_parts.append("\n\n")
 
         for cls in self.classes:
-            header_file_content += cls.generate_header_content()
+            header_parts.append(cls.generate_header_content())
 
-        header_file_content += f"#endif // {guard_name}"
+        header_parts.append(f"#endif // {guard_name}")
 
-        return header_file_content
+        return "".join(header_parts)
 
     def generate_source_content(self):
-        source_content = f'#include "{self.name}.hpp"\n\n'
+        source_parts: List[str] = [f'#include "{self.name}.hpp"\n\n']
 
         for struct in self.structs:
-            source_content += struct.generate_source_content()
+            source_parts.append(struct.generate_source_content())
 
         for cls in self.classes:
-            source_content += cls.generate_source_content()
+            source_parts.append(cls.generate_source_content())
 
-        return source_content
+        return "".join(source_parts)
 
 
 # Example usage
 if __name__ == "__main__":
 
     cpp_header_and_source = CppHeaderAndSource("example_file")
+    cpp_header_and_source.add_include("#include <string>\n")
 
     cpp_struct = CppStruct("ExampleStruct")
     cpp_struct.add_member(CppMember("w", CppType.INT))
     cpp_struct.add_member(CppMember("z", CppType.INT))
+    # a member with a default value renders as "int scale = 3;"
+    cpp_struct.add_member(CppMember("scale", CppType.INT, "3"))
     cpp_struct.add_method(CppMethod("add", "int", [], "return w + z;"))
 
     cpp_class = CppClass("ExampleClass")
     cpp_class.add_member(CppMember("x", CppType.INT))
     cpp_class.add_member(CppMember("y", CppType.FLOAT))
     cpp_class.add_include("#include <iostream>\n")
+    # <string> is already included at file level, so it is only emitted once
+    cpp_class.add_include("#include <string>\n")
 
     # Add a constructor using the new method
     cpp_class.add_constructor(